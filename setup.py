@@ -12,7 +12,9 @@ setup(
         ('share/' + package_name, ['package.xml']),
         ('share/' + package_name + '/launch', ['launch/voice_control.launch.py']),
     ],
-    install_requires=['setuptools', 'websocket-client'],
+    install_requires=['setuptools', 'websocket-client', 'numpy', 'sounddevice', 'soxr', 'pynput',
+                      'scipy'],
+    extras_require={'speedups': ['numba', 'pyahocorasick', 'orjson']},
     zip_safe=True,
     maintainer='root',
     maintainer_email='root@todo.todo',
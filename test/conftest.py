@@ -0,0 +1,42 @@
+# 为纯逻辑测试提供ROS与音频设备相关依赖的替身，未安装时才替换
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    try:
+        __import__(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+
+
+class _Node:
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class _Vector3:
+
+    def __init__(self):
+        self.x = self.y = self.z = 0.0
+
+
+class _Twist:
+
+    def __init__(self):
+        self.linear = _Vector3()
+        self.angular = _Vector3()
+
+
+_stub('rclpy')
+_stub('rclpy.node', Node=_Node)
+_stub('geometry_msgs')
+_stub('geometry_msgs.msg', Twist=_Twist)
+_stub('rcl_interfaces')
+_stub('rcl_interfaces.msg', ParameterDescriptor=object)
+_stub('pynput', keyboard=None)
+_stub('sounddevice')
+_stub('websocket')
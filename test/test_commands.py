@@ -0,0 +1,38 @@
+import pytest
+
+from voice_control import voice_control_node as vc
+
+
+@pytest.fixture(params=['automaton', 'fallback'])
+def matcher(request, monkeypatch):
+    if request.param == 'automaton':
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(vc, 'ahocorasick', None)
+    return vc.CommandMatcher(vc.COMMANDS)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('前进', '前进'),
+    ('请原地左转。', '原地左转'),
+    ('原地右转', '原地右转'),
+    ('停止', '停止'),
+    ('停', '停'),
+    # 等长时按指令表顺序
+    ('停止前进', '前进'),
+    # 后出现但更长的指令优先于先出现的短指令
+    ('不要停下来，后退', '后退'),
+    ('今天天气不错', None),
+    ('', None),
+])
+def test_match(matcher, text, expected):
+    assert matcher.match(text) == expected
+
+
+def test_paths_agree(monkeypatch):
+    pytest.importorskip('ahocorasick')
+    automaton = vc.CommandMatcher(vc.COMMANDS)
+    monkeypatch.setattr(vc, 'ahocorasick', None)
+    fallback = vc.CommandMatcher(vc.COMMANDS)
+    for text in ['向前后退', '左转右转', '加速减速停', '原地左转停止', '往右转一下']:
+        assert automaton.match(text) == fallback.match(text)
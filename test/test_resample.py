@@ -0,0 +1,69 @@
+import sys
+
+import numpy as np
+import pytest
+
+from voice_control import voice_control_node as vc
+
+
+@pytest.mark.parametrize('rate', [44100, 48000, 22050, 8000, 32000])
+def test_fallback_converter_matches_resample_poly(monkeypatch, rate):
+    signal = pytest.importorskip('scipy.signal')
+    monkeypatch.setattr(vc, 'soxr', None)
+    convert_rate, reset = vc.AudioDeviceManager()._make_rate_converter(rate)
+
+    rng = np.random.default_rng(rate)
+    audio = (rng.standard_normal(vc.CHUNK_SIZE) * 8000).astype(np.int16)
+    g = np.gcd(rate, vc.RATE_TARGET)
+    expected = signal.resample_poly(audio.astype(np.float64), vc.RATE_TARGET // g, rate // g)
+    expected = np.rint(np.clip(expected, -32768, 32767)).astype(np.int16)
+
+    resampled = convert_rate(audio)
+    assert resampled.dtype == np.int16
+    assert len(resampled) == len(expected)
+    # 预设计的FIR为float32，与float64参考实现最多相差1 LSB
+    assert np.abs(resampled.astype(np.int32) - expected).max() <= 1
+    assert reset() is None
+
+
+def test_soxr_reset_drops_previous_recording_tail(monkeypatch):
+    soxr = pytest.importorskip('soxr')
+    monkeypatch.setattr(vc, 'soxr', soxr)
+    mgr = vc.AudioDeviceManager()
+    mgr.configure({'index': 0, 'rate': 48000, 'channels': 1, 'resample_required': True})
+
+    mgr.resample_audio(np.full((vc.CHUNK_SIZE, 1), 20000, dtype=np.int16))
+    mgr.reset_resampler()
+    silence = np.zeros((vc.CHUNK_SIZE, 1), dtype=np.int16)
+    tail = np.concatenate([mgr.resample_audio(silence) for _ in range(3)])
+    # 只允许soxr的抖动噪声
+    assert np.abs(tail).max(initial=0) <= 1
+
+
+@pytest.mark.parametrize('channels', [2, 3, 4])
+def test_numpy_mixdown_close_to_mean(monkeypatch, channels):
+    monkeypatch.setitem(sys.modules, 'numba', None)
+    mixdown = vc.AudioDeviceManager()._make_mixdown(channels)
+    rng = np.random.default_rng(channels)
+    audio = rng.integers(-32768, 32768, vc.CHUNK_SIZE * channels).astype(np.int16)
+
+    mixed = mixdown(audio)
+    assert mixed.dtype == np.int16
+    assert np.abs(mixed - audio.reshape(-1, channels).mean(axis=1)).max() <= 1
+
+
+@pytest.mark.parametrize('channels', [2, 4])
+def test_numba_mixdown_compiled_before_first_chunk(channels):
+    pytest.importorskip('numba')
+    mixdown = vc.AudioDeviceManager()._make_mixdown(channels)
+    # 构造时已用静音帧触发编译，首个真实chunk不再等待JIT
+    kernel, = [c.cell_contents for c in mixdown.__closure__
+               if hasattr(c.cell_contents, 'signatures')]
+    assert kernel.signatures
+
+    rng = np.random.default_rng(channels)
+    audio = rng.integers(-32768, 32768, vc.CHUNK_SIZE * channels).astype(np.int16)
+    mixed = mixdown(audio)
+    assert len(kernel.signatures) == 1
+    assert mixed.dtype == np.int16
+    assert np.abs(mixed - audio.reshape(-1, channels).mean(axis=1)).max() <= 1
@@ -1,21 +1,38 @@
 #!/usr/bin/env python3
 import os
 import time
+import signal
+import select
 import threading
-import pyaudio
+import collections
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import sounddevice as sd
 import numpy as np
-import librosa
+try:
+    import soxr
+except ImportError:
+    soxr = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 import websocket
 import json
 import base64
+import binascii
 import hashlib
 import hmac
+import math
 from urllib.parse import urlencode
 from datetime import datetime
 from time import mktime
 from wsgiref.handlers import format_date_time
 import ssl
-import wave
 from pynput import keyboard 
 
 import rclpy
@@ -29,19 +46,47 @@ XFYUN_APIKEY = os.getenv('XFYUN_APIKEY')
 XFYUN_APISECRET = os.getenv('XFYUN_APISECRET')
 RATE_TARGET = 16000
 CHANNELS_TARGET = 1
-FORMAT_TARGET = pyaudio.paInt16
+FORMAT_TARGET = 'int16'
 CHUNK_SIZE = 1280
+MAX_RECORD_SECONDS = 60  # 讯飞听写单次音频最长60秒
+RAW_QUEUE_CHUNKS = 32  # 读取与重采样线程间最多积压的chunk数
+FRAME_SAMPLES = 640  # 每帧40ms，即讯飞建议的1280字节
+WS_CONNECT_TIMEOUT = 5.0  # 建立连接（TCP+TLS握手）的超时时间，秒
+WS_RESULT_TIMEOUT = 10.0  # 发送结束帧后等待最终识别结果的最长时间，秒
+WS_STANDBY_SECONDS = 8.0  # 讯飞连接10秒内无数据会被服务端断开，备用连接只在此时限内复用
+WS_REFRESH_SECONDS = 6.0  # 备用连接存在超过此时长即在后台替换，保证按下空格时总有可用连接
+WS_ACTIVE_SECONDS = 300.0  # 启动或上次录音后的这段时间内才持续替换备用连接，空闲时不反复连接讯飞
+# 语音指令 -> (线速度x, 角速度z)
+COMMANDS = {
+    "前进": (0.2, 0.0), "向前": (0.2, 0.0), "后退": (-0.2, 0.0),
+    "左转": (0.0, 0.5), "右转": (0.0, -0.5), "停": (0.0, 0.0),
+    "停止": (0.0, 0.0), "原地左转": (0.0, 1.0), "原地右转": (0.0, -1.0),
+    "加速": (0.4, 0.0), "减速": (0.1, 0.0)
+}
+
+def mixdown_i16(x, ch, out):
+    """将交错的多声道int16样本按帧求平均，写入预分配的out并返回有效部分（numba编译用）"""
+    n = x.shape[0] // ch
+    for i in range(n):
+        acc = 0
+        for c in range(ch):
+            acc += x[i * ch + c]
+        out[i] = acc // ch
+    return out[:n]
+
+def no_reset():
+    """无跨chunk状态的转换函数所用的重置函数"""
 
 class AudioDeviceManager:
 
     def __init__(self, logger=None):
         self.logger = logger
-        self.p = pyaudio.PyAudio()
         self.device_index = None
         self.input_rate = None
         self.input_channels = None
         self.stream = None
         self.resample_required = False
+        self.resample_audio, self.reset_resampler = self._make_resampler(RATE_TARGET, CHANNELS_TARGET)
         
     def log(self, message, level='info'):
         if self.logger:
@@ -51,58 +96,162 @@ class AudioDeviceManager:
     
     def select_device(self, preferred_index=None):
         try:
-            default_device = self.p.get_default_input_device_info()
+            default_device = sd.query_devices(kind='input')
             self.log(f"默认音频设备: {default_device['name']} (索引: {default_device['index']})")
             
             if preferred_index is not None and preferred_index >= 0:
                 self.device_index = preferred_index
-                device_info = self.p.get_device_info_by_index(preferred_index)
+                device_info = sd.query_devices(preferred_index)
                 self.log(f"使用参数指定的设备: {device_info['name']} (索引: {preferred_index})")
             else:
                 self.device_index = default_device['index']
                 device_info = default_device
                 self.log("使用系统默认音频设备")
             
-            self.input_rate = int(device_info['defaultSampleRate'])
-            self.input_channels = int(device_info['maxInputChannels'])
-            self.log(f"设备原生参数: {self.input_rate}Hz, {self.input_channels}通道")
-            
+            # 优先探测16kHz单声道：多数USB麦克风原生支持，可完全跳过重采样
             if self.check_device_support(self.device_index, RATE_TARGET, CHANNELS_TARGET, FORMAT_TARGET):
                 self.input_rate = RATE_TARGET
                 self.input_channels = CHANNELS_TARGET
                 self.log("设备支持目标参数，无需重采样")
                 self.resample_required = False
-            else:
-                self.log(f"设备不支持目标参数，需要重采样到{RATE_TARGET}Hz单声道")
-                self.resample_required = True
+                return True
+            
+            self.input_rate = int(device_info['default_samplerate'])
+            self.input_channels = int(device_info['max_input_channels'])
+            self.log(f"设备原生参数: {self.input_rate}Hz, {self.input_channels}通道")
+            # 原生采样率下若能直接以单声道打开，就省去每个chunk的声道混合
+            if self.input_channels > CHANNELS_TARGET and self.check_device_support(
+                    self.device_index, self.input_rate, CHANNELS_TARGET, FORMAT_TARGET):
+                self.input_channels = CHANNELS_TARGET
+            self.log(f"设备不支持目标参数，需要从{self.input_rate}Hz {self.input_channels}通道重采样到{RATE_TARGET}Hz单声道")
+            # 重采样器只在采集子进程的configure()中构建，主进程无需准备
+            self.resample_required = True
             
             return True
         except Exception as e:
             self.log(f"设备检测失败: {str(e)}", 'error')
             return False
     
+    def configure(self, info):
+        """按get_audio_info()的结果直接配置设备，供采集子进程跳过探测"""
+        self.device_index = info['index']
+        self.input_rate = info['rate']
+        self.input_channels = info['channels']
+        self.resample_required = info['resample_required']
+        self.resample_audio, self.reset_resampler = self._make_resampler(self.input_rate, self.input_channels)
+
+    def _make_resampler(self, input_rate, input_channels):
+        """设备参数确定后生成专用的转换函数：(帧数, 声道数)的int16数组 -> 16kHz单声道int16数组
+        
+        根据是否需要混合声道、是否需要变换采样率返回四种函数之一，每个chunk无需再做判断。
+        同时返回重置函数，新录音开始前调用，清除重采样器中残留的上一段录音。
+        """
+        reset = no_reset
+        if input_channels > 1:
+            mixdown = self._make_mixdown(input_channels)
+        if input_rate != RATE_TARGET:
+            convert_rate, reset = self._make_rate_converter(input_rate)
+        
+        if input_channels == 1 and input_rate == RATE_TARGET:
+            return (lambda data: data.reshape(-1)), reset
+        if input_rate == RATE_TARGET:
+            return (lambda data: mixdown(data.reshape(-1))), reset
+        if input_channels == 1:
+            return (lambda data: convert_rate(data.reshape(-1))), reset
+        return (lambda data: convert_rate(mixdown(data.reshape(-1)))), reset
+
+    def _make_mixdown(self, channels):
+        """生成声道混合函数，输出写入预分配的缓冲区"""
+        out = np.empty(CHUNK_SIZE, dtype=np.int16)
+        # 只有多声道设备才需要numba，延迟导入以免拖慢单声道设备的启动
+        try:
+            from numba import njit
+        except ImportError:
+            njit = None
+        if njit is not None:
+            kernel = njit(cache=True, fastmath=True)(mixdown_i16)
+            # njit在首次调用时才编译，先用一帧静音触发编译，避免第一段录音开头被阻塞而丢失
+            kernel(np.zeros(channels, dtype=np.int16), channels, out)
+            return lambda audio: kernel(audio, channels, out)
+        if channels == 2:
+            def mixdown_stereo(audio):
+                audio2d = audio.reshape(-1, 2)
+                mixed = out[:len(audio2d)]
+                # 双声道各右移一位再相加，不会溢出int16，也无需提升到int32
+                np.right_shift(audio2d[:, 0], 1, out=mixed)
+                mixed += audio2d[:, 1] >> 1
+                return mixed
+            return mixdown_stereo
+        acc_buf = np.empty(CHUNK_SIZE, dtype=np.int32)
+
+        def mixdown_numpy(audio):
+            # 无numba时全程整数运算
+            audio2d = audio.reshape(-1, channels)
+            mixed, acc = out[:len(audio2d)], acc_buf[:len(audio2d)]
+            np.sum(audio2d, axis=1, dtype=np.int32, out=acc)
+            np.floor_divide(acc, channels, out=acc)
+            np.copyto(mixed, acc, casting='unsafe')
+            return mixed
+        return mixdown_numpy
+
+    def _make_rate_converter(self, input_rate):
+        """生成从input_rate到16kHz的单声道重采样函数及其重置函数"""
+        if soxr is not None:
+            # 流式重采样器跨chunk保持滤波器状态，换录音时须clear()，否则上一段的尾部会出现在下一段开头
+            rs = soxr.ResampleStream(input_rate, RATE_TARGET, 1, dtype='int16', quality='HQ')
+            return rs.resample_chunk, rs.clear
+        # 仅在没有soxr时才导入scipy，避免拖慢节点启动
+        from scipy.signal import firwin, upfirdn
+        # 采样率比固定，预先设计多相FIR，与scipy.signal.resample_poly的滤波器一致
+        g = math.gcd(input_rate, RATE_TARGET)
+        up, down = RATE_TARGET // g, input_rate // g
+        max_rate = max(up, down)
+        half_len = 10 * max_rate
+        h = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)).astype(np.float32) * up
+        # 前后补零使滤波器群延迟对齐到降采样网格
+        n_pre_pad = down - half_len % down
+        n_out = -(-CHUNK_SIZE * up // down)
+        offset = (half_len + n_pre_pad) // down
+        n_post_pad = 0
+        while ((CHUNK_SIZE - 1) * up + len(h) + n_pre_pad + n_post_pad - 1) // down + 1 < n_out + offset:
+            n_post_pad += 1
+        fir = np.concatenate([np.zeros(n_pre_pad, np.float32), h, np.zeros(n_post_pad, np.float32)])
+        scratch = np.empty(n_out, dtype=np.int16)
+
+        def convert_rate(audio):
+            try:
+                # 直接在int16量纲上滤波，不做/32768与*32768的来回缩放
+                resampled = upfirdn(fir, audio, up, down)[offset:offset + n_out]
+                np.clip(resampled, -32768, 32767, out=resampled)
+                out = scratch[:len(resampled)]
+                np.rint(resampled, out=out, casting='unsafe')
+                return out
+            except Exception as e:
+                self.log(f"重采样失败: {str(e)}", 'error')
+                return audio
+        # 逐chunk独立滤波，没有跨chunk状态
+        return convert_rate, no_reset
+
     def check_device_support(self, device_index, rate, channels, format):
         try:
-            test_stream = self.p.open(
-                format=format, channels=channels, rate=rate, input=True,
-                input_device_index=device_index, frames_per_buffer=CHUNK_SIZE
-            )
-            test_stream.stop_stream()
-            test_stream.close()
+            sd.check_input_settings(device=device_index, channels=channels, dtype=format, samplerate=rate)
             return True
         except Exception:
             return False
     
-    def open_stream(self):
+    def open_stream(self, callback):
+        """以回调模式打开输入流，callback每次收到CHUNK_SIZE帧的int16数组"""
+        # 无需重采样时直接按目标参数打开，采集数据即为16kHz单声道
+        rate = self.input_rate if self.resample_required else RATE_TARGET
+        channels = self.input_channels if self.resample_required else CHANNELS_TARGET
         try:
-            self.stream = self.p.open(
-                format=FORMAT_TARGET, channels=self.input_channels, rate=self.input_rate,
-                input=True, input_device_index=self.device_index,
-                frames_per_buffer=CHUNK_SIZE, start=False
+            self.stream = sd.InputStream(
+                device=self.device_index, samplerate=rate, channels=channels,
+                dtype=FORMAT_TARGET, blocksize=CHUNK_SIZE, callback=callback
             )
-            actual_device = self.p.get_device_info_by_index(self.device_index)
+            actual_device = sd.query_devices(self.device_index)
             self.log(f"成功打开音频设备: {actual_device['name']}")
-            self.stream.start_stream()
+            self.stream.start()
             return True
         except Exception as e:
             self.log(f"打开音频流失败: {str(e)}", 'error')
@@ -114,68 +263,210 @@ class AudioDeviceManager:
             'channels': self.input_channels, 'resample_required': self.resample_required
         }
     
-    def resample_audio(self, data):
-        if not self.resample_required:
-            return data
-        
-        audio = np.frombuffer(data, dtype=np.int16)
-        
-        if self.input_channels > 1:
-            audio = audio.reshape(-1, self.input_channels).mean(axis=1).astype(np.int16)
-        
-        if self.input_rate != RATE_TARGET:
-            try:
-                audio_float = audio.astype(np.float32) / 32768.0
-                resampled_float = librosa.resample(audio_float, orig_sr=self.input_rate, target_sr=RATE_TARGET)
-                return (resampled_float * 32768).astype(np.int16).tobytes()
-            except Exception as e:
-                self.log(f"重采样失败: {str(e)}", 'error')
-                return audio.tobytes()
-        
-        return audio.tobytes()
-    
     def close(self):
         if self.stream:
-            self.stream.stop_stream()
+            self.stream.stop()
             self.stream.close()
-        self.p.terminate()
         self.log("音频资源已释放")
 
+def capture_worker(device_info, shm_name, capacity, write_index, ring_slot, recording, stop_event, ready, log_queue):
+    """采集子进程：接收麦克风数据、重采样并写入共享内存环形缓冲区，不与ROS主进程争抢GIL"""
+    # 生命周期由主进程控制，忽略Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((2, capacity), dtype=np.int16, buffer=shm.buf)
+    audio_mgr = AudioDeviceManager(logger=QueueLogger(log_queue))
+    # 音频回调与重采样线程之间的有界队列，元素为(缓冲区编号, 原始音频)
+    raw_chunks = collections.deque(maxlen=RAW_QUEUE_CHUNKS)
+    chunks_ready = threading.Event()
+    # 回调中只记录输入溢出等状态，由主线程输出日志
+    input_status = collections.deque(maxlen=RAW_QUEUE_CHUNKS)
+    # 重采样线程跟不上时deque会挤掉最旧的chunk，计数后由主线程输出日志
+    dropped_chunks = 0
+
+    def write_chunk(slot, chunk):
+        """把16kHz单声道数据追加到当前录音的缓冲区"""
+        with write_index.get_lock():
+            # 丢弃录音已结束或属于上一段录音的数据
+            if not recording.is_set() or slot != ring_slot.value:
+                return
+            w = write_index.value
+            n = min(len(chunk), capacity - w)
+            if n < len(chunk) and w < capacity:
+                audio_mgr.log(f"录音超过{MAX_RECORD_SECONDS}秒，后续音频将被丢弃", 'warn')
+            np.copyto(ring[slot, w:w + n], chunk[:n])
+            write_index.value = w + n
+
+    def audio_callback(indata, frames, time_info, status):
+        """PortAudio实时回调：只拷贝indata（仅在回调期间有效）并入队，不获取任何锁
+
+        写共享内存需要与主进程共用的写指针锁，交给重采样线程完成，
+        避免实时回调等待持锁的主进程线程。
+        """
+        if status:
+            input_status.append(status)
+        nonlocal dropped_chunks
+        if not recording.is_set():
+            return
+        if len(raw_chunks) == RAW_QUEUE_CHUNKS:
+            dropped_chunks += 1
+        raw_chunks.append((ring_slot.value, indata.copy()))
+        chunks_ready.set()
+
+    def resample_loop():
+        """重采样线程：取出原始音频，重采样（16kHz单声道设备则原样）后写入当前录音的缓冲区"""
+        last_slot = None
+        while not stop_event.is_set():
+            chunks_ready.wait(0.1)
+            chunks_ready.clear()
+            while True:
+                try:
+                    slot, raw_data = raw_chunks.popleft()
+                except IndexError:
+                    break
+                if slot != last_slot:
+                    # 新的一段录音，丢弃重采样器中上一段录音的残留
+                    audio_mgr.reset_resampler()
+                    last_slot = slot
+                write_chunk(slot, audio_mgr.resample_audio(raw_data))
+
+    try:
+        audio_mgr.configure(device_info)
+        resampler = threading.Thread(target=resample_loop, daemon=True)
+        resampler.start()
+        # 重采样在独立线程中进行，音频回调不会被拖慢
+        if not audio_mgr.open_stream(audio_callback):
+            return
+        ready.set()
+        # 输入异常每秒最多汇总输出一次
+        while not stop_event.wait(1.0):
+            if input_status:
+                count, last = len(input_status), input_status[-1]
+                input_status.clear()
+                audio_mgr.log(f"音频输入异常 {count} 次: {last}", 'warn')
+            if dropped_chunks:
+                count, dropped_chunks = dropped_chunks, 0
+                audio_mgr.log(f"重采样处理不及，丢弃了 {count} 块音频", 'warn')
+        resampler.join(timeout=1.0)
+    finally:
+        audio_mgr.close()
+        ring = None
+        shm.close()
+
+class QueueLogger:
+    """与rclpy logger接口一致，把日志放入队列交给主进程的日志分发线程输出"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def debug(self, message):
+        self.queue.put(('debug', message))
+
+    def info(self, message):
+        self.queue.put(('info', message))
+
+    def warn(self, message):
+        self.queue.put(('warn', message))
+
+    def error(self, message):
+        self.queue.put(('error', message))
+
+def wait_readable(ws, timeout):
+    """等待连接上有可读数据，SSL层已解密缓存的数据select看不到，需单独检查"""
+    sock = ws.sock
+    if isinstance(sock, ssl.SSLSocket) and sock.pending():
+        return True
+    return bool(select.select([sock], [], [], timeout)[0])
+
+def connect_ws(url):
+    """建立讯飞WebSocket连接，握手受WS_CONNECT_TIMEOUT限制，连接后收发恢复为阻塞模式"""
+    ws = websocket.create_connection(url, timeout=WS_CONNECT_TIMEOUT, sslopt={"cert_reqs": ssl.CERT_NONE})
+    ws.settimeout(None)
+    return ws
+
+def send_json(ws, obj):
+    """以文本帧发送JSON；有orjson时直接发送其生成的UTF-8字节，省去str再编码"""
+    if orjson is not None:
+        ws.send(orjson.dumps(obj), websocket.ABNF.OPCODE_TEXT)
+    else:
+        ws.send(json.dumps(obj))
+
+def make_twist(linear_x, angular_z):
+    """构造只含线速度x和角速度z的Twist消息"""
+    twist_msg = Twist()
+    twist_msg.linear.x = float(linear_x)
+    twist_msg.angular.z = float(angular_z)
+    return twist_msg
+
+class CommandMatcher:
+    """在识别文本中查找指令：同时命中多个时取最长的（"原地左转"优先于"左转"），等长时按表中顺序"""
+
+    def __init__(self, commands):
+        self.priority = {cmd: (len(cmd), -i) for i, cmd in enumerate(commands)}
+        self._ac = None
+        if ahocorasick is not None:
+            self._ac = ahocorasick.Automaton()
+            for cmd, priority in self.priority.items():
+                self._ac.add_word(cmd, (priority, cmd))
+            self._ac.make_automaton()
+
+    def match(self, text):
+        """返回优先级最高的指令，未找到返回None"""
+        if self._ac is not None:
+            # Aho-Corasick自动机一次扫描找出所有命中的指令
+            matches = [value for _, value in self._ac.iter(text)]
+        else:
+            matches = [(priority, cmd) for cmd, priority in self.priority.items() if cmd in text]
+        if not matches:
+            return None
+        return max(matches)[1]
+
+class RecordingSession:
+    """一次录音：使用的缓冲区编号，以及停止录音时的最终样本数"""
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.end = None
+
 class VoiceControlNode(Node):
     def __init__(self):
         super().__init__('voice_control_node')
         self.publisher_ = self.create_publisher(Twist, '/cmd_vel', 10)
         self.get_logger().info("语音控制节点启动中...")
-        self.stop_event = threading.Event()
+        self._mp_ctx = mp.get_context('spawn')
+        self.stop_event = self._mp_ctx.Event()
+        # 按键线程和采集子进程的日志统一交给分发线程输出，不占用音频相关线程
+        self._log_queue = self._mp_ctx.Queue()
+        self.async_logger = QueueLogger(self._log_queue)
+        self._log_dispatcher = threading.Thread(target=self.dispatch_logs, daemon=True)
+        self._log_dispatcher.start()
 
         self.audio_mgr = AudioDeviceManager(logger=self.get_logger())
         
         self.declare_parameter('device_index', -1, ParameterDescriptor(description='麦克风索引 (-1=自动)'))
         param_index = self.get_parameter('device_index').get_parameter_value().integer_value
 
-        if not self.audio_mgr.select_device(param_index) or not self.audio_mgr.open_stream():
+        if not self.audio_mgr.select_device(param_index) or not self.start_capture_process():
             self.get_logger().error("音频设备初始化失败，节点将退出")
             self.create_timer(1.0, lambda: self.destroy_node())
             return
 
         self.get_logger().info(f"🎤 音频设备: {self.audio_mgr.get_audio_info()}")
-        
-      
-        self.is_recording = False
-        self.audio_buffer = []
-        self.recording_lock = threading.Lock()
-
-        self.commands = {
-            "前进": (0.2, 0.0), "向前": (0.2, 0.0), "后退": (-0.2, 0.0),
-            "左转": (0.0, 0.5), "右转": (0.0, -0.5), "停": (0.0, 0.0), 
-            "停止": (0.0, 0.0), "原地左转": (0.0, 1.0), "原地右转": (0.0, -1.0),
-            "加速": (0.4, 0.0), "减速": (0.1, 0.0)
-        }
 
-        
-        self.audio_capture_thread = threading.Thread(target=self.capture_audio_loop, daemon=True)
-        self.audio_capture_thread.start()
-        
+        self.commands = COMMANDS
+        self._matcher = CommandMatcher(self.commands)
+        # 指令表固定，启动时一次性构造好所有Twist消息
+        self._twist_cache = {cmd: make_twist(lx, az) for cmd, (lx, az) in self.commands.items()}
+
+        # 预先建立一条备用连接，按下空格时省去TCP+TLS握手
+        self._ws_lock = threading.Lock()
+        self._ws_standby = None
+        self._ws_prewarming = False
+        self._last_activity = time.monotonic()
+        self.start_prewarm()
+        if all([XFYUN_APPID, XFYUN_APIKEY, XFYUN_APISECRET]):
+            self.create_timer(1.0, self.refresh_standby)
+
         self.keyboard_listener = keyboard.Listener(on_press=self.on_key_press)
         self.keyboard_listener.start()
 
@@ -198,83 +489,253 @@ class VoiceControlNode(Node):
         except AttributeError:
             # 特殊按键，空格键
             if key == keyboard.Key.space:
-                with self.recording_lock:
-                    self.is_recording = not self.is_recording
-                    if self.is_recording:
-                        # 开始录音
-                        self.audio_buffer.clear()
-                        self.get_logger().info("\n▶️  录音开始... (再次按下空格键结束)")
-                    else:
-                        # 停止录音并处理
-                        self.get_logger().info("⏹️  录音结束，正在处理...")
-                        if self.audio_buffer:
-                            # 将音频数据复制出来，防止多线程问题
-                            recorded_data = b''.join(self.audio_buffer)
-                            # 在新线程中处理，避免阻塞键盘监听
-                            threading.Thread(target=self.process_audio, args=(recorded_data,)).start()
-                        else:
-                            self.get_logger().warn("录音内容为空。")
+                if not self._recording.is_set():
+                    self.start_recording()
+                else:
+                    self.stop_recording()
         return True
 
-    def capture_audio_loop(self):
-        """一个专门的线程，只负责从麦克风读取数据并根据状态存入缓冲区"""
-        while not self.stop_event.is_set():
-            raw_data = self.audio_mgr.stream.read(CHUNK_SIZE, exception_on_overflow=False)
-            with self.recording_lock:
-                if self.is_recording:
-                    processed_data = self.audio_mgr.resample_audio(raw_data)
-                    self.audio_buffer.append(processed_data)
-            # 短暂休眠，避免100% CPU占用
-            time.sleep(0.01)
-
-    def process_audio(self, audio_data):
-        """一次性处理完整的音频数据"""
+    def start_recording(self):
+        """切换到另一块缓冲区开始录音，并立即开始流式识别"""
+        # 两块缓冲区交替使用，上一段录音识别期间即可开始新的录音
+        slot = 1 - self._ring_slot.value
+        user = self._ring_users[slot]
+        if user is not None and user.is_alive():
+            self.async_logger.warn("前两段录音仍在识别中，请稍后再试。")
+            return
+        session = RecordingSession(slot)
+        self._last_activity = time.monotonic()
+        # 写指针的锁同时保护录音状态，与采集子进程互斥
+        with self._ring_w.get_lock():
+            self._ring_slot.value = slot
+            self._ring_w.value = 0
+            self._recording.set()
+        self._session = session
+        self.async_logger.info("\n▶️  录音开始... (再次按下空格键结束)")
+        # 边录边发，在新线程中处理，避免阻塞键盘监听
+        worker = threading.Thread(target=self.process_audio, args=(session,))
+        self._ring_users[slot] = worker
+        worker.start()
+
+    def stop_recording(self):
+        """停止录音，记录本段录音的最终长度，由发送线程发完剩余音频"""
+        with self._ring_w.get_lock():
+            self._recording.clear()
+            self._session.end = self._ring_w.value
+        self.async_logger.info("⏹️  录音结束，正在处理...")
+
+    def dispatch_logs(self):
+        """日志分发线程：依次输出队列中的日志，收到None时退出"""
+        while True:
+            item = self._log_queue.get()
+            if item is None:
+                break
+            level, message = item
+            getattr(self.get_logger(), level)(message)
+
+    def start_capture_process(self):
+        """创建共享内存双缓冲区并启动采集子进程，等待其成功打开音频流"""
+        capacity = MAX_RECORD_SECONDS * RATE_TARGET
+        self._shm = shared_memory.SharedMemory(create=True, size=2 * capacity * np.dtype(np.int16).itemsize)
+        self._ring = np.ndarray((2, capacity), dtype=np.int16, buffer=self._shm.buf)
+        self._ring_w = self._mp_ctx.Value('i', 0)
+        # 当前写入的缓冲区编号，由_ring_w的锁保护
+        self._ring_slot = self._mp_ctx.RawValue('i', 0)
+        self._ring_users = [None, None]
+        self._recording = self._mp_ctx.Event()
+        ready = self._mp_ctx.Event()
+
+        self.audio_capture_process = self._mp_ctx.Process(
+            target=capture_worker, daemon=True,
+            args=(self.audio_mgr.get_audio_info(), self._shm.name, capacity,
+                  self._ring_w, self._ring_slot, self._recording, self.stop_event, ready, self._log_queue)
+        )
+        self.audio_capture_process.start()
+        while not ready.wait(0.1):
+            if not self.audio_capture_process.is_alive():
+                return False
+        return True
+
+    def process_audio(self, session):
+        """录音期间按40ms一帧把缓冲区中的新音频流式发送给讯飞，并在发送间隙接收识别结果"""
         ws_param = self.create_ws_param()
         if not ws_param: return
         
-        ws_url = ws_param.create_url()
+        ws = None
+        final_result = ""
+        dispatched = None
+
+        def receive_one():
+            """读取一帧识别结果并累积，返回识别是否结束
+
+            已累积的文本一旦能匹配出指令就立即发布，不等最终结果。代价是部分文本的匹配
+            可能被后续片段推翻（如"不要停下来，"之后又识别出"后退"）：此时按累积文本
+            重新匹配并改发新指令，最终仍以完整文本为准，由handle_final_result收尾。
+            """
+            nonlocal final_result, dispatched
+            finished, text = self.read_result_frame(ws)
+            final_result += text
+            if text:
+                cmd = self.match_command(final_result)
+                if cmd is not None and cmd != dispatched:
+                    self.publish_command(cmd, early=True)
+                    dispatched = cmd
+            return finished
+
         try:
-            ws = websocket.create_connection(ws_url, sslopt={"cert_reqs": ssl.CERT_NONE})
-            
-            # 1. 发送开始帧
-            ws.send(json.dumps({
+            # 1. 录音开始即取得连接并发送开始帧，握手（若无可用的备用连接）与说话同时进行
+            ws = self.acquire_connection(ws_param, {
                 "common": ws_param.CommonArgs, "business": ws_param.BusinessArgs,
                 "data": {"status": 0}
-            }))
+            })
             
-            # 2. 一次性发送所有音频数据
-            ws.send(json.dumps({
-                "data": {"status": 1, "audio": base64.b64encode(audio_data).decode('utf-8')}
-            }))
+            # 2. 跟随采集进程的写指针，逐帧发送音频
+            audio = self._ring[session.slot]
+            sent = 0
+            finished = False
+            while not finished:
+                with self._ring_w.get_lock():
+                    end = session.end
+                    available = end if end is not None else self._ring_w.value
+                while available - sent >= FRAME_SAMPLES or (end is not None and sent < available):
+                    frame = audio[sent:min(sent + FRAME_SAMPLES, available)]
+                    send_json(ws, {
+                        "data": {"status": 1, "audio": binascii.b2a_base64(frame, newline=False).decode('ascii')}
+                    })
+                    sent += len(frame)
+                if end is not None or self.stop_event.is_set():
+                    break
+                # 等待下一帧音频期间，取走已到达的识别片段
+                if wait_readable(ws, FRAME_SAMPLES / RATE_TARGET):
+                    finished = receive_one()
             
-            # 3. 发送结束帧
-            ws.send(json.dumps({"data": {"status": 2}}))
+            if sent == 0:
+                self.get_logger().warn("录音内容为空。")
+                ws.close()
+                return
             
-            # 4. 接收最终结果
-            final_result = ""
-            while True:
-                message = ws.recv()
-                msg = json.loads(message)
-                if msg.get("code") != 0:
-                    self.get_logger().error(f"识别错误: {msg.get('message', '未知错误')}")
-                    break
-                
-                data = msg.get("data", {})
-                result = data.get("result", {})
-                words = [w.get("w", '') for item in result.get("ws", []) for w in item.get("cw", [])]
-                final_result += "".join(words)
-                
-                if data.get("status") == 2: # 收到最终结果
-                    break
+            # 3. 发送结束帧，并在WS_RESULT_TIMEOUT内接收剩余结果
+            # 超时按网络错误处理，保证连接半开时线程也能退出并释放缓冲区
+            deadline = time.monotonic() + WS_RESULT_TIMEOUT
+            ws.settimeout(WS_RESULT_TIMEOUT)
+            if not finished:
+                send_json(ws, {"data": {"status": 2}})
+            while not finished:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{WS_RESULT_TIMEOUT:.0f}秒内未收到最终识别结果")
+                ws.settimeout(remaining)
+                finished = receive_one()
             
             ws.close()
-            self.handle_final_result(final_result)
+            self.handle_final_result(final_result, dispatched)
             
         except Exception as e:
             self.get_logger().error(f"处理音频时发生网络或协议错误: {e}")
+            if ws:
+                ws.close()
+        finally:
+            # 讯飞每条连接只能识别一次，为下一次录音预备新连接
+            if not self.stop_event.is_set():
+                self.start_prewarm()
+
+    def read_result_frame(self, ws):
+        """读取一帧识别结果，返回(识别是否结束, 文本片段)"""
+        opcode, frame = ws.recv_data_frame()
+        if opcode == websocket.ABNF.OPCODE_CLOSE:
+            return True, ""
+        if opcode != websocket.ABNF.OPCODE_TEXT:
+            # 非文本帧不含识别结果，无需解析JSON
+            return False, ""
+        msg = json.loads(frame.data)
+        if msg.get("code") != 0:
+            self.get_logger().error(f"识别错误: {msg.get('message', '未知错误')}")
+            return True, ""
+        
+        data = msg.get("data", {})
+        result = data.get("result", {})
+        words = [w.get("w", '') for item in result.get("ws", []) for w in item.get("cw", [])]
+        return data.get("status") == 2, "".join(words)
+
+    def start_prewarm(self):
+        """在独立的守护线程中预建立备用连接，不占用录音线程；同一时间只预建一条"""
+        with self._ws_lock:
+            if self._ws_prewarming:
+                return
+            self._ws_prewarming = True
+        threading.Thread(target=self.prewarm_connection, daemon=True).start()
+
+    def refresh_standby(self):
+        """定时器回调：备用连接缺失或即将被服务端断开时，在后台替换为新连接
 
-    def handle_final_result(self, text):
-        """处理最终的识别文本"""
+        只在启动或上次录音后的WS_ACTIVE_SECONDS内替换；之后不再维持备用连接，
+        下一次录音自行建立连接，多一次握手，但空闲时不会每隔几秒就连接一次讯飞。
+        """
+        if self.stop_event.is_set():
+            return
+        if time.monotonic() - self._last_activity > WS_ACTIVE_SECONDS:
+            # 空闲期间释放已过期的备用连接
+            with self._ws_lock:
+                standby = self._ws_standby
+                if standby is not None and time.monotonic() - standby[1] >= WS_STANDBY_SECONDS:
+                    self._ws_standby = None
+                else:
+                    standby = None
+            if standby is not None:
+                standby[0].close()
+            return
+        with self._ws_lock:
+            standby = self._ws_standby
+        if standby is None or time.monotonic() - standby[1] >= WS_REFRESH_SECONDS:
+            self.start_prewarm()
+
+    def prewarm_connection(self):
+        """后台建立备用连接，失败时不报错，由acquire_connection重新连接"""
+        try:
+            if not all([XFYUN_APPID, XFYUN_APIKEY, XFYUN_APISECRET]):
+                return
+            try:
+                ws = connect_ws(self.create_ws_param().create_url())
+            except Exception as e:
+                self.get_logger().debug(f"预建立连接失败: {e}")
+                return
+            with self._ws_lock:
+                previous, self._ws_standby = self._ws_standby, (ws, time.monotonic())
+            if previous:
+                previous[0].close()
+        finally:
+            with self._ws_lock:
+                self._ws_prewarming = False
+
+    def acquire_connection(self, ws_param, first_frame):
+        """取出仍然有效的备用连接并发送开始帧，备用连接失效时改用新建的连接
+
+        ws.connected在服务端断开后仍可能为True：备用连接上尚未发送任何请求就可读，
+        说明已收到关闭帧或EOF；发送开始帧失败也视为失效，此时重新连接，不丢失本次录音。
+        """
+        with self._ws_lock:
+            standby, self._ws_standby = self._ws_standby, None
+        if standby:
+            ws, opened_at = standby
+            if (ws.connected and time.monotonic() - opened_at < WS_STANDBY_SECONDS
+                    and not wait_readable(ws, 0)):
+                try:
+                    send_json(ws, first_frame)
+                    return ws
+                except Exception as e:
+                    self.get_logger().debug(f"备用连接已失效，重新连接: {e}")
+            ws.close()
+        ws = connect_ws(ws_param.create_url())
+        send_json(ws, first_frame)
+        return ws
+
+    def publish_command(self, cmd, early=False):
+        """发布指令对应的Twist消息"""
+        self.get_logger().info(f"✅ {'提前' if early else ''}执行指令: '{cmd}'")
+        self.publisher_.publish(self._twist_cache[cmd])
+
+    def handle_final_result(self, text, dispatched=None):
+        """处理最终的识别文本；dispatched为根据部分结果已提前发布的指令"""
         if not text:
             self.get_logger().warn("识别结果为空。")
             self.get_logger().info("\n请按 [空格键] 开始下一次录音，或按 [q] 退出。")
@@ -282,23 +743,27 @@ class VoiceControlNode(Node):
 
         self.get_logger().info(f"识别结果: \"{text}\"")
         
-        # 模糊匹配，找到第一个就执行
-        for cmd, (linear_x, angular_z) in self.commands.items():
-            if cmd in text:
-                self.get_logger().info(f"✅ 执行指令: '{cmd}'")
-                twist_msg = Twist()
-                twist_msg.linear.x = float(linear_x)
-                twist_msg.angular.z = float(angular_z)
-                self.publisher_.publish(twist_msg)
-                self.get_logger().info("\n请按 [空格键] 开始下一次录音，或按 [q] 退出。")
-                return # 执行完第一个匹配的指令后就返回
+        cmd = self.match_command(text)
+        if cmd is not None:
+            # 完整文本的匹配结果为准，与提前发布的指令相同时不再重复发布
+            if cmd != dispatched:
+                self.publish_command(cmd)
+            else:
+                self.get_logger().info(f"指令 '{cmd}' 已根据部分识别结果提前执行")
+            self.get_logger().info("\n请按 [空格键] 开始下一次录音，或按 [q] 退出。")
+            return
         
         self.get_logger().warn(f"在 \"{text}\" 中未找到有效指令。")
         self.get_logger().info("\n请按 [空格键] 开始下一次录音，或按 [q] 退出。")
 
+    def match_command(self, text):
+        """在识别文本中查找优先级最高的指令，未找到返回None"""
+        return self._matcher.match(text)
 
     def create_ws_param(self):
-        """创建WebSocket认证URL和参数"""
+        """创建WebSocket认证URL和参数，凭证不变，首次创建后复用"""
+        if getattr(self, '_ws_param', None):
+            return self._ws_param
         if not all([XFYUN_APPID, XFYUN_APIKEY, XFYUN_APISECRET]):
             self.get_logger().error("讯飞API凭证未完整设置，请检查环境变量。")
             return None
@@ -309,20 +774,25 @@ class VoiceControlNode(Node):
                 self.CommonArgs = {"app_id": self.APPID}
                 # 注意：这里不再需要vad_eos，因为我们手动结束
                 self.BusinessArgs = {"domain": "iat", "language": "zh_cn", "accent": "mandarin"}
+                # 密钥固定，预先完成HMAC的密钥填充，每次签名只需copy()
+                self._hmac = hmac.new(self.APISecret.encode('utf-8'), digestmod=hashlib.sha256)
 
             def create_url(self):
                 url = 'wss://ws-api.xfyun.cn/v2/iat'
                 now = datetime.now()
                 date = format_date_time(mktime(now.timetuple()))
                 signature_origin = f"host: ws-api.xfyun.cn\ndate: {date}\nGET /v2/iat HTTP/1.1"
-                signature_sha = hmac.new(self.APISecret.encode('utf-8'), signature_origin.encode('utf-8'), digestmod=hashlib.sha256).digest()
+                signer = self._hmac.copy()
+                signer.update(signature_origin.encode('utf-8'))
+                signature_sha = signer.digest()
                 signature = base64.b64encode(signature_sha).decode('utf-8')
                 authorization_origin = f'api_key="{self.APIKey}", algorithm="hmac-sha256", headers="host date request-line", signature="{signature}"'
                 authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
                 v = {"authorization": authorization, "date": date, "host": "ws-api.xfyun.cn"}
                 return url + '?' + urlencode(v)
         
-        return Ws_Param(XFYUN_APPID, XFYUN_APIKEY, XFYUN_APISECRET)
+        self._ws_param = Ws_Param(XFYUN_APPID, XFYUN_APIKEY, XFYUN_APISECRET)
+        return self._ws_param
     
     def destroy_node(self):
         """优雅地关闭节点和所有资源"""
@@ -333,11 +803,33 @@ class VoiceControlNode(Node):
         if hasattr(self, 'keyboard_listener') and self.keyboard_listener.is_alive():
             self.keyboard_listener.stop()
         
-        if hasattr(self, 'audio_capture_thread') and self.audio_capture_thread.is_alive():
-            self.audio_capture_thread.join(timeout=1.0)
+        if hasattr(self, '_ws_lock'):
+            with self._ws_lock:
+                standby, self._ws_standby = self._ws_standby, None
+            if standby:
+                standby[0].close()
+
+        if hasattr(self, 'audio_capture_process') and self.audio_capture_process.is_alive():
+            self.audio_capture_process.join(timeout=1.0)
+            if self.audio_capture_process.is_alive():
+                self.audio_capture_process.terminate()
+
+        if hasattr(self, '_shm'):
+            self._ring = None
+            self._shm.unlink()
+            try:
+                self._shm.close()
+            except BufferError:
+                # 仍有识别线程持有缓冲区视图，随进程退出释放
+                pass
+            del self._shm
             
         if self.audio_mgr:
             self.audio_mgr.close()
+
+        if hasattr(self, '_log_dispatcher') and self._log_dispatcher.is_alive():
+            self._log_queue.put(None)
+            self._log_dispatcher.join(timeout=1.0)
             
         super().destroy_node()
         # 确保所有日志都能在shutdown前刷出